@@ -0,0 +1,49 @@
+"""
+Measures how many calls per second configurable functions handle under asyncio, compared with undecorated ones.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_configurable_async
+"""
+import asyncio
+import sys
+import time
+import data_tools as dt
+
+
+async def handler(request, timeout=10, retries=3, *, verbose=False):
+    return request, timeout, retries, verbose
+
+
+def sync_handler(request, timeout=10, retries=3, *, verbose=False):
+    return request, timeout, retries, verbose
+
+
+async def measure(name, call, number=200000):
+    """
+    Prints how many calls per second are made by awaiting call once per iteration in one task.
+    """
+    start = time.perf_counter()
+    for request in range(number):
+        await call(request)
+    seconds = time.perf_counter() - start
+    print("{:<40}{:>12,.0f} calls/s".format(name, number / seconds))
+
+
+async def main():
+    configured_handler = dt.configurable(handler)
+    configured_sync_handler = dt.configurable(sync_handler)
+
+    async def call_sync(request):
+        return configured_sync_handler(request)
+
+    for argv in (["bench.py"], ["bench.py", "--timeout", "30", "--verbose"]):
+        sys.argv = argv
+        print(" ".join(argv))
+        await measure("undecorated", handler)
+        await measure("configurable", configured_handler)
+        await measure("configurable (sync, awaited wrapper)", call_sync)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""
+Measures the throughput of safe_repr, to_argv and fingerprint on large nested values, compared with the round trip
+through repr and safe_eval.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_safe_repr
+"""
+import timeit
+import data_tools as dt
+
+
+def large_values():
+    """
+    Creates a range of large nested values to benchmark against.
+    """
+    return {
+        "flat_list": list(range(100000)),
+        "nested_list": [[index, str(index), None] for index in range(20000)],
+        "set": set(range(50000)),
+        "dict": {str(index): [index, index / 3] for index in range(20000)},
+        "nested_dict": {"level_{}".format(index): {"size": index, "names": ["a", "b"]} for index in range(5000)},
+    }
+
+
+def benchmark(name, function, size, number=5):
+    """
+    Prints how many bytes per second the function handles, given the size in bytes of its output.
+    """
+    seconds = min(timeit.repeat(function, number=number, repeat=3)) / number
+    print("{:<40}{:>10.2f} ms{:>10.1f} MB/s".format(name, seconds * 1000, size / seconds / 1e6))
+
+
+def main():
+    values = large_values()
+    for name, value in values.items():
+        size = len(dt.safe_repr(value))
+        benchmark("safe_repr({})".format(name), lambda: dt.safe_repr(value), size)
+        benchmark("repr({})".format(name), lambda: repr(value), size)
+        benchmark("safe_eval(safe_repr({}))".format(name), lambda: dt.safe_eval(dt.safe_repr(value)), size)
+
+    # Many small configurations, like the command lines for a large batch of jobs
+    configs = [
+        {"job": index, "db": {"name": "test", "pool": {"size": 8}}, "tags": ["a", "b"]} for index in range(10000)]
+    size = sum(len(" ".join(dt.to_argv(config, flatten=True))) for config in configs)
+    benchmark("to_argv(10000 configs)", lambda: [list(dt.to_argv(config, flatten=True)) for config in configs], size)
+    benchmark("fingerprint(10000 configs)", lambda: [dt.fingerprint(config) for config in configs], size)
+
+
+if __name__ == "__main__":
+    main()
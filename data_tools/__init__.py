@@ -1,2 +1,4 @@
-from .configurable import configurable
-from .safe_eval import safe_eval
+from .configurable import configurable, configurable_namespace, to_argv, fingerprint
+from .safe_eval import safe_eval, safe_repr
+from .frozen import freeze, FrozenDict
+from .config_server import ConfigServer, ConfigClient
@@ -0,0 +1,290 @@
+import asyncio
+import threading
+from ast import literal_eval
+
+
+# Snapshots are sent as a single line, so allow lines much longer than asyncio's 64KiB default
+_STREAM_LIMIT = 2 ** 26
+
+
+class ConfigServer:
+    """
+    Serves a set of configuration values to local worker processes over a Unix domain socket.
+
+    Every connected client is sent a full snapshot of the values when it connects, and is then pushed every update as
+    it happens. Each snapshot and update carries a version number, which increases by one with every update.
+
+    Messages are sent one per line as the repr of a tuple (version, updated_values, removed_names), so only values
+    which literal_eval reads back as equal values can be served. Anything else, such as inf, nan or a datetime, raises
+    a ValueError.
+
+    For example, from within a running event loop:
+
+        server = ConfigServer("/tmp/config.sock", {"max_iterations": 10})
+        await server.start()
+        server.update(max_iterations=20)
+
+    :param path:
+    The path of the Unix domain socket to listen on.
+
+    :param values:
+    Default: None
+    The initial configuration values.
+    """
+
+    def __init__(self, path, values=None):
+        self.path = path
+        self.values = dict(values or {})
+        _check_values(self.values)
+        self.version = 0
+        self._server = None
+        self._writers = set()
+
+    async def start(self):
+        """
+        Starts listening for clients on the socket.
+        """
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=self.path, limit=_STREAM_LIMIT)
+
+    async def close(self):
+        """
+        Stops listening for clients and disconnects any which are connected.
+        """
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def update(self, values=None, remove=(), **updated_values):
+        """
+        Updates the configuration values and pushes the changes to every connected client.
+
+        This must be called from the event loop the server is running on.
+
+        :param values:
+        Default: None
+        A dictionary of values to update.
+
+        :param remove:
+        Default: ()
+        The names of any values to remove.
+
+        :param updated_values:
+        Further values to update.
+
+        :return:
+        The new version number.
+
+        :raises ValueError:
+        If any value can't be read back by clients, in which case nothing is updated.
+        """
+        updated_values = dict(values or {}, **updated_values)
+        _check_values(updated_values)
+        removed_names = tuple(name for name in remove if name in self.values)
+        for name in removed_names:
+            del self.values[name]
+        self.values.update(updated_values)
+        self.version += 1
+        self._broadcast(self.version, updated_values, removed_names)
+        return self.version
+
+    def _broadcast(self, version, updated_values, removed_names):
+        message = _encode_message(version, updated_values, removed_names)
+        for writer in list(self._writers):
+            if writer.is_closing():
+                self._writers.discard(writer)
+            else:
+                writer.write(message)
+
+    async def _handle_client(self, reader, writer):
+
+        # Send the full snapshot, then leave the client registered for pushed updates
+        writer.write(_encode_message(self.version, self.values, ()))
+        self._writers.add(writer)
+
+        # Clients never send anything, so this just waits for them to disconnect
+        try:
+            await reader.read()
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class ConfigClient:
+    """
+    Keeps a local snapshot of the values served by a ConfigServer.
+
+    The connection is handled by an event loop on a background thread, so lookups never leave the process: get and
+    __getitem__ are plain dictionary lookups against the latest snapshot. This can be passed to configurable as its
+    source.
+
+    Values are shared with every other reader in the process rather than copied, so they must not be mutated. Pass
+    frozen=True to configurable to get immutable equivalents instead.
+
+    If an update can't be read or the server closes, lookups raise a RuntimeError rather than using a stale snapshot.
+
+    For example:
+
+        client = ConfigClient("/tmp/config.sock").start()
+        max_iterations = configurable(max_iterations=10, source=client)
+
+    :param path:
+    The path of the Unix domain socket the server is listening on.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.values = {}
+        self.version = None
+        self._loop = None
+        self._thread = None
+        self._writer = None
+        self._receiver = None
+        self._error = None
+        self._version_changed = threading.Condition()
+
+    def start(self, timeout=10):
+        """
+        Connects to the server and waits for the first snapshot.
+
+        :param timeout:
+        Default: 10
+        How many seconds to wait for the first snapshot.
+
+        :return:
+        The client itself.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        # Make sure the background thread is stopped if anything goes wrong
+        try:
+            asyncio.run_coroutine_threadsafe(self._connect(), self._loop).result(timeout)
+            if not self.wait_for_version(0, timeout):
+                raise TimeoutError("No snapshot received from {}".format(self.path))
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def close(self):
+        """
+        Disconnects from the server and stops the background thread.
+        """
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._disconnect(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def wait_for_version(self, version, timeout=None):
+        """
+        Waits until the snapshot is at least the given version.
+
+        :param version:
+        The version to wait for.
+
+        :param timeout:
+        Default: None
+        How many seconds to wait. If None, wait forever.
+
+        :return:
+        Whether the version was reached.
+
+        :raises RuntimeError:
+        If the client stopped receiving updates because one couldn't be read or the server closed.
+        """
+        with self._version_changed:
+            version_reached = self._version_changed.wait_for(
+                lambda: self._error is not None or (self.version is not None and self.version >= version), timeout)
+        self._check_error()
+        return version_reached
+
+    def get(self, name, default=None):
+        self._check_error()
+        return self.values.get(name, default)
+
+    def __getitem__(self, name):
+        self._check_error()
+        return self.values[name]
+
+    def __contains__(self, name):
+        self._check_error()
+        return name in self.values
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def _connect(self):
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=_STREAM_LIMIT)
+        self._receiver = self._loop.create_task(self._receive(reader))
+
+    async def _disconnect(self):
+        if self._receiver is not None:
+            self._receiver.cancel()
+            self._receiver = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _check_error(self):
+        """
+        Raises an error if the snapshot is stale because an update couldn't be read or the server closed.
+        """
+        if self._error is not None:
+            raise RuntimeError("Stopped receiving updates from {}".format(self.path)) from self._error
+
+    async def _receive(self, reader):
+        try:
+            await self._receive_updates(reader)
+
+            # The server only stops sending when it closes, after which the snapshot is never updated again
+            raise ConnectionError("{} closed the connection".format(self.path))
+
+        # Record the failure rather than letting the task die quietly, so lookups don't silently use a stale snapshot
+        except Exception as error:
+            with self._version_changed:
+                self._error = error
+                self._version_changed.notify_all()
+
+    async def _receive_updates(self, reader):
+        async for line in reader:
+            version, updated_values, removed_names = literal_eval(line.decode())
+
+            # Swap in a new snapshot rather than mutating the old one, so readers on other threads never see a
+            # partially applied update
+            values = dict(self.values)
+            for name in removed_names:
+                values.pop(name, None)
+            values.update(updated_values)
+            with self._version_changed:
+                self.values = values
+                self.version = version
+                self._version_changed.notify_all()
+
+
+def _check_values(values):
+    """
+    Makes sure every value will be read back by literal_eval as an equal value.
+    """
+    for name, value in values.items():
+        try:
+            readable = literal_eval(repr(value)) == value
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            readable = False
+        if not readable:
+            raise ValueError("Cannot serve {}={!r}, as it can't be read back by literal_eval".format(name, value))
+
+
+def _encode_message(version, updated_values, removed_names):
+    return (repr((version, dict(updated_values), tuple(removed_names))) + "\n").encode()
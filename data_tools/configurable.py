@@ -1,7 +1,14 @@
 import sys
-from .safe_eval import safe_eval
+from .safe_eval import safe_eval, safe_repr
+from .frozen import FrozenDict, _freeze_shared
 import inspect
 import collections
+import functools
+import hashlib
+import itertools
+import os
+from concurrent import futures
+from collections.abc import Mapping
 
 
 class NotConfigured:
@@ -12,7 +19,7 @@ class NotConfigured:
     pass
 
 
-def configurable(configurable_function=None, return_type=None, **parameters):
+def configurable(configurable_function=None, return_type=None, source=None, frozen=False, **parameters):
     """
     Looks for each parameter in the command line arguments and return them as appropriate.
 
@@ -37,6 +44,9 @@ def configurable(configurable_function=None, return_type=None, **parameters):
     Any variables without command line arguments will work normally, meaning values provided to the function will
     be passed to it and any defaults will be preserved.
 
+    Coroutine functions and async generator functions are wrapped in native async functions, so they are still
+    recognized by inspect.iscoroutinefunction and inspect.isasyncgenfunction.
+
     :param configurable_function:
     If provided, make all parameters to the function configurable. This can be used as a decorator.
 
@@ -45,6 +55,21 @@ def configurable(configurable_function=None, return_type=None, **parameters):
     The type of the returned values.
     If None, this will return a list if multiple values should be returned.
 
+    :param source:
+    Default: None
+    A mapping of further values to look parameters up in, such as a ConfigClient. Command line arguments take
+    precedence over the source, and the source takes precedence over defaults. Values from the source are returned
+    as they are rather than copied, so they are shared with anything else using the source and must not be mutated.
+    If given without any parameters, function or return type, this returns a decorator which uses the source.
+
+    :param frozen:
+    Default: False
+    If True, return deeply immutable equivalents of the values, as created by freeze, which can be shared and hashed
+    without copying. When decorating a function, only the configured values passed to it are frozen.
+    Defaults and values from the source are frozen once per object and the same frozen object is returned each time,
+    so mutating them afterwards isn't seen.
+    If given without any parameters, function or return type, this returns a decorator which uses it.
+
     :param parameters:
     The parameters to configure.
 
@@ -58,70 +83,173 @@ def configurable(configurable_function=None, return_type=None, **parameters):
     x = configurable(x="test")
     """
 
+    # If it's only handed options then return a decorator which uses them
+    if configurable_function is None and return_type is None and (source is not None or frozen) and not parameters:
+        return functools.partial(configurable, return_type=return_type, source=source, frozen=frozen)
+
     #######################################################################
     # If it's handed a function, configure all parameters of the function #
     #######################################################################
 
     if configurable_function:
-        def _wrapper(*args, **kwargs):
-
-            # Get the function spec
-            function_spec = inspect.getfullargspec(configurable_function)
-
-            # Create dictionaries for positional and keyword arguments
-            function_parameters = {
-                "args": collections.OrderedDict((arg, NotConfigured) for arg in function_spec.args),
-                "*args": [],
-                "kwargs": collections.OrderedDict((kwarg, NotConfigured) for kwarg in function_spec.kwonlyargs)
-            }
 
-            # Update positional arguments with default values of the parameters
-            if function_spec.defaults:
-                values_to_assign = function_spec.defaults[:len(function_parameters["args"])]
-                for index, positional_argument in enumerate(reversed(values_to_assign)):
-                    variable_to_assign = list(function_parameters["args"].keys())[-index - 1]
-                    function_parameters["args"][variable_to_assign] = positional_argument
+        # Get the function spec once, along with templates of each parameter's default value
+        function_spec = inspect.getfullargspec(configurable_function)
+        positional_names = function_spec.args
+        keyword_names = function_spec.kwonlyargs
+        positional_defaults = collections.OrderedDict((arg, NotConfigured) for arg in positional_names)
+        if function_spec.defaults:
+            positional_defaults.update(zip(reversed(positional_names), reversed(function_spec.defaults)))
+        keyword_defaults = collections.OrderedDict((kwarg, NotConfigured) for kwarg in keyword_names)
+        if function_spec.kwonlydefaults:
+            keyword_defaults.update(function_spec.kwonlydefaults)
+
+        # Where each parameter is in the command line arguments, which only changes when they do
+        parameter_indices = (None, ())
+
+        def _configure(kwargs):
+            """
+            Gets the values of every parameter of the function which has been configured, including any arbitrary
+            keyword arguments in kwargs.
+            """
+            nonlocal parameter_indices
+
+            # Find the parameters in the command line arguments, unless they've already been found
+            argv_index = _argv_index()
+            if parameter_indices[0] is not argv_index:
+                parameter_indices = (argv_index, [
+                    (parameter, argv_index.find(parameter)) for parameter in positional_names + keyword_names])
+            all_parameters = parameter_indices[1]
+            if kwargs:
+                all_parameters = all_parameters + [
+                    (kwarg, argv_index.find(kwarg)) for kwarg in kwargs
+                    if kwarg not in positional_defaults and kwarg not in keyword_defaults]
+
+            # Get the values of any parameters in the command line arguments, or else the source
+            configured_parameters = {}
+            for parameter, parameter_index in all_parameters:
+                if parameter_index is not None:
+                    configured_parameters[parameter] = argv_index.value(parameter_index, frozen)
+                elif source is not None:
+                    parameter_value = source.get(parameter, NotConfigured)
+                    if parameter_value is not NotConfigured and frozen:
+                        configured_parameters[parameter] = _freeze_shared(parameter_value)
+                    elif parameter_value is not NotConfigured:
+                        configured_parameters[parameter] = parameter_value
+            return configured_parameters
+
+        def _call_configured(configured_parameters, args, kwargs):
+            """
+            Calls the function with the passed in values of the parameters, overridden by the configured ones.
+            """
 
             # Update positional arguments with passed in values of the parameters
-            values_to_assign = args[:len(function_parameters["args"])]
-            for index, positional_argument in enumerate(values_to_assign):
-                variable_to_assign = list(function_parameters["args"].keys())[index]
-                function_parameters["args"][variable_to_assign] = positional_argument
-
-            # Grab arbitrary positional arguments
-            function_parameters["*args"] = args[len(function_parameters["args"]):]
-
-            # Update keyword arguments with default values of the parameters
-            if function_spec.kwonlydefaults:
-                function_parameters["kwargs"].update(function_spec.kwonlydefaults)
-
-            # Update keyword arguments with passed in values of the parameters
-            for keyword_parameter, keyword_value in kwargs.items():
-                if keyword_parameter in function_parameters["args"]:
-                    function_parameters["args"][keyword_parameter] = keyword_value
-                else:
-                    function_parameters["kwargs"][keyword_parameter] = keyword_value
-
-            # Update with command line values of the parameters
-            all_parameters = list(function_parameters["args"].keys()) + list(function_parameters["kwargs"].keys())
-            all_parameters = {any_parameter: NotConfigured() for any_parameter in all_parameters}
-            all_parameters = configurable(return_type=dict, **all_parameters)
-            configured_parameters = {
-                configured_parameter: configured_value
-                for configured_parameter, configured_value in all_parameters.items()
-                if not isinstance(configured_value, NotConfigured)}
-            for keyword_parameter, keyword_value in configured_parameters.items():
-                if keyword_parameter in function_parameters["args"]:
-                    function_parameters["args"][keyword_parameter] = keyword_value
-                else:
-                    function_parameters["kwargs"][keyword_parameter] = keyword_value
-
-            # Return the result of the function with all parameters
-            result = configurable_function(
-                *function_parameters["args"].values(),
-                *function_parameters["*args"],
-                **function_parameters["kwargs"])
-            return result
+            function_args = positional_defaults.copy()
+            function_args.update(zip(positional_names, args))
+
+            # Update with passed in, then configured, values of the keyword parameters
+            function_kwargs = keyword_defaults.copy()
+            for parameters_to_assign in (kwargs, configured_parameters):
+                for keyword_parameter, keyword_value in parameters_to_assign.items():
+                    if keyword_parameter in function_args:
+                        function_args[keyword_parameter] = keyword_value
+                    else:
+                        function_kwargs[keyword_parameter] = keyword_value
+
+            # Return the result of the function with all parameters, including arbitrary positional arguments
+            return configurable_function(*function_args.values(), *args[len(positional_names):], **function_kwargs)
+
+        # Coroutine functions and async generator functions need native async wrappers, so that frameworks which check
+        # for them still recognize the decorated function
+        if inspect.iscoroutinefunction(configurable_function):
+            @functools.wraps(configurable_function)
+            async def _wrapper(*args, **kwargs):
+                return await _call_configured(_configure(kwargs), args, kwargs)
+            return _wrapper
+
+        elif inspect.isasyncgenfunction(configurable_function):
+            @functools.wraps(configurable_function)
+            async def _wrapper(*args, **kwargs):
+                async_generator = _call_configured(_configure(kwargs), args, kwargs)
+
+                # Forward anything sent or thrown in to the original generator, like yield from does for generators
+                try:
+                    item = await async_generator.asend(None)
+                    while True:
+                        try:
+                            sent = yield item
+                        except GeneratorExit:
+                            raise
+                        except BaseException as error:
+                            item = await async_generator.athrow(error)
+                        else:
+                            item = await async_generator.asend(sent)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    await async_generator.aclose()
+            return _wrapper
+
+        @functools.wraps(configurable_function)
+        def _wrapper(*args, **kwargs):
+            return _call_configured(_configure(kwargs), args, kwargs)
+
+        def _map(iterable, workers=None, chunksize=1, ordered=True, executor="thread", buffersize=None):
+            """
+            Calls the function on each item of the iterable, like the builtin map.
+
+            The command line is only looked at once, when this is called, rather than once per item, so this is much
+            faster than calling the function in a loop. Items are streamed through a pool in chunks, with only a
+            bounded number of chunks in flight at once, so the iterable can be arbitrarily long.
+
+            As with normal calls, lists, dicts and sets from the command line are interpreted afresh for each item,
+            so items never share mutable values. Only immutable and frozen values are interpreted once.
+
+            :param iterable:
+            The items to pass to the function as its first argument.
+
+            :param workers:
+            Default: None
+            The number of workers in the pool. If None, the pool's default is used.
+
+            :param chunksize:
+            Default: 1
+            The number of items to send to a worker at once.
+
+            :param ordered:
+            Default: True
+            Whether to return results in the same order as the items. If False, results are returned as they finish.
+
+            :param executor:
+            Default: "thread"
+            "thread" or "process" to run in a new pool of that kind, an existing concurrent.futures.Executor to run
+            in, or None to run in the calling thread. The process pool requires the function to be defined at the
+            top level of a module so it can be pickled.
+
+            :param buffersize:
+            Default: None
+            The maximum number of chunks in flight at once. If None, this is twice the number of workers.
+
+            :return:
+            An iterator of the results.
+            """
+
+            # Keep the text of any mutable values from the command line, so they can be interpreted for each item
+            configured_parameters = _configure({})
+            argv_index, all_parameters = parameter_indices
+            unparsed_parameters = {
+                parameter: argv_index.argv[parameter_index + 1]
+                for parameter, parameter_index in all_parameters
+                if parameter_index is not None and not frozen
+                and type(configured_parameters[parameter]) not in _ArgvIndex.immutable_types}
+            for parameter in unparsed_parameters:
+                del configured_parameters[parameter]
+
+            call_chunk = functools.partial(_call_chunk, _wrapper, configured_parameters, unparsed_parameters)
+            return _stream_chunks(call_chunk, iterable, workers, chunksize, ordered, executor, buffersize)
+
+        _wrapper._call_configured = _call_configured
+        _wrapper.map = _map
         return _wrapper
 
     #########################################################################################
@@ -132,36 +260,26 @@ def configurable(configurable_function=None, return_type=None, **parameters):
     values = []
 
     # Make command line parameters more easily searchable
-    command_line_parameters_dict = {value: index for index, value in enumerate(sys.argv)}
+    argv_index = _argv_index()
 
     # Loop through each key word argument, seeing if it was given as a command line parameter
     for parameter, default in parameters.items():
 
         # Check to see if any valid form of the parameter is given
         parameter_value = default
-        parameter_index = command_line_parameters_dict.get("--" + parameter)  # Long form
-        if parameter_index is None:
-            parameter_index = command_line_parameters_dict.get(
-                "-" + "".join([word[0] for word in parameter.split("_")]))  # Short form
+        parameter_index = argv_index.find(parameter)
 
         # If the parameter is present then return the value specified via command line
         if parameter_index is not None:
+            parameter_value = argv_index.value(parameter_index, frozen)
 
-            # If it's the last input then no value was specified, so assume it's a flag
-            if len(command_line_parameters_dict) <= parameter_index + 1:
-                parameter_value = True
-
-            # Else, get the value specified
-            else:
-                parameter_value = sys.argv[parameter_index + 1]
-
-                # If this value is also a parameter then no value was specified, so assume it's a flag
-                if len(parameter_value) >= 2 and parameter_value[0] == "-" and not parameter_value[1].isdigit():
-                    parameter_value = True
+        # Else, fall back on the source if it has the parameter
+        elif source is not None:
+            parameter_value = source.get(parameter, default)
 
-                # Else, interpret in the value
-                else:
-                    parameter_value = safe_eval(parameter_value)
+        # Values from the command line are already frozen, but defaults and values from the source aren't
+        if frozen and parameter_index is None:
+            parameter_value = _freeze_shared(parameter_value)
 
         # Append the value to our list of values
         values.append(parameter_value)
@@ -187,3 +305,359 @@ def configurable(configurable_function=None, return_type=None, **parameters):
     # Else, just try to convert the values to the type
     else:
         return return_type(values)
+
+
+def configurable_namespace(prefix="", return_type=dict, frozen=False, **defaults):
+    """
+    Looks for every dotted parameter under a prefix in the command line arguments and returns them as a nested
+    structure.
+
+    For example, if you run your script with --db.pool.size 8 --db.pool.timeout 30 --db.name test, then:
+
+        configurable_namespace("db.pool", timeout=10, retries=3)
+
+    Will return {"size": 8, "timeout": 30, "retries": 3}, and configurable_namespace("db") will return
+    {"pool": {"size": 8, "timeout": 30}, "name": "test"}.
+
+    Dotted parameters are indexed into a prefix tree once per set of command line arguments, so this only costs as
+    much as the size of the namespace returned. The only other cost is checking whether sys.argv has changed since
+    the last lookup, which is a single list comparison.
+
+    A parameter can't be both a value and a namespace, so --db 5 --db.pool.size 8 raises a ValueError when the db
+    namespace is retrieved.
+
+    :param prefix:
+    Default: ""
+    The dotted prefix of the namespace. If empty, every long form parameter is returned.
+
+    :param return_type:
+    Default: dict
+    The type of each level of the returned namespace. Anything other than dict will be called with each level's
+    values as keyword arguments, so types.SimpleNamespace will return an object with attribute access.
+
+    :param frozen:
+    Default: False
+    If True, return deeply immutable equivalents of the values, as created by freeze. If the return type is dict,
+    each level of the namespace is returned as a FrozenDict.
+
+    :param defaults:
+    Default values for the namespace, relative to the prefix. Nested namespaces can be given as mappings, such as
+    dictionaries or FrozenDicts.
+
+    :return:
+    The namespace, with command line values taking precedence over defaults.
+    """
+
+    # Find the node of the prefix tree for the namespace
+    argv_index = _argv_index()
+    node = argv_index.tree
+    for word in prefix.split(".") if prefix else ():
+        node = node.children.get(word)
+        if node is None:
+            break
+
+    # Merge the namespace over the defaults
+    return _merge_namespace(defaults, node, argv_index, return_type, frozen)
+
+
+def to_argv(config, short=False, flatten=False):
+    """
+    Generates command line arguments which configurable will read back as the given configuration.
+
+    This is the inverse of configurable. Parameters are sorted by name and values are written with safe_repr, so equal
+    configurations whose values have the same types always give the same arguments. As with safe_repr, values such as
+    1 and 1.0 give different arguments.
+
+    For example:
+
+        list(to_argv({"max_iterations": 10, "db": {"name": "test"}}, flatten=True))
+
+    Will return ["--db.name", "'test'", "--max_iterations", "10"].
+
+    :param config:
+    A mapping from parameter name to value.
+
+    :param short:
+    Default: False
+    If True, use the short form of each parameter, such as -mi rather than --max_iterations.
+
+    :param flatten:
+    Default: False
+    If True, nested mappings with string keys are written as dotted parameters, as read by configurable_namespace.
+
+    :return:
+    A generator of the arguments, alternating between parameters and values.
+
+    :raises ValueError:
+    If two parameters give the same argument, such as max_iterations and min_items in short form, as configurable
+    would only read one of them back.
+    """
+    parameters = _flatten_config(config, "") if flatten else config.items()
+    parameters = sorted(parameters, key=lambda parameter_and_value: parameter_and_value[0])
+
+    # Make sure each argument is only given once
+    parameter_from_argument = {}
+    for parameter, _ in parameters:
+        argument = _short_form(parameter) if short else "--" + parameter
+        if argument in parameter_from_argument:
+            raise ValueError("Both {} and {} give the argument {}".format(
+                parameter_from_argument[argument], parameter, argument))
+        parameter_from_argument[argument] = parameter
+
+    return _generate_argv(parameter_from_argument.keys(), parameters)
+
+
+def fingerprint(config, flatten=False):
+    """
+    Creates a stable fingerprint of a configuration, which is the same for any two equal configurations whose values
+    have the same types.
+
+    This can be used to find duplicate jobs, even across processes and python versions. Values which compare equal but
+    have different types or signs count as different, so {"lr": 1} and {"lr": 1.0} give different fingerprints, as do
+    {"lr": 0.0} and {"lr": -0.0}.
+
+    :param config:
+    A mapping from parameter name to value.
+
+    :param flatten:
+    Default: False
+    If True, nested mappings are flattened into dotted parameters first, as in to_argv.
+
+    :return:
+    The hex digest of the SHA-256 hash of the configuration's command line arguments.
+    """
+    fingerprint_hash = hashlib.sha256()
+    for argument in to_argv(config, flatten=flatten):
+        fingerprint_hash.update(argument.encode())
+        fingerprint_hash.update(b"\0")
+    return fingerprint_hash.hexdigest()
+
+
+class _PrefixNode:
+    """
+    A node of the prefix tree of dotted command line parameters.
+    """
+
+    __slots__ = ("children", "index")
+
+    def __init__(self):
+        self.children = {}
+        self.index = None
+
+
+class _ArgvIndex:
+    """
+    An index of the command line arguments, which is built once and reused until the arguments change.
+
+    positions maps each argument to where it is in argv, and tree is a prefix tree of every long form parameter
+    split on dots.
+    """
+
+    # Values of these types can be shared between calls, so are only interpreted once
+    immutable_types = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+    def __init__(self, argv):
+        self.argv = list(argv)
+        self.positions = {value: index for index, value in enumerate(argv)}
+        self.tree = _PrefixNode()
+        self._immutable_values = {}
+        for value, index in self.positions.items():
+            if value.startswith("--") and len(value) > 2:
+                node = self.tree
+                for word in value[2:].split("."):
+                    node = node.children.setdefault(word, _PrefixNode())
+                node.index = index
+
+    def find(self, parameter):
+        """
+        Gets the index in argv of the long form of the parameter, or else the short form. If neither is given, this
+        returns None.
+        """
+        parameter_index = self.positions.get("--" + parameter)  # Long form
+        if parameter_index is None:
+            parameter_index = self.positions.get(_short_form(parameter))  # Short form
+        return parameter_index
+
+    def value(self, parameter_index, frozen=False):
+        """
+        Gets the value of the parameter at the index in argv, frozen if specified.
+        """
+        parameter_value = self._immutable_values.get(parameter_index, NotConfigured)
+        if parameter_value is not NotConfigured:
+            return parameter_value
+
+        # If it's the last input then no value was specified, so assume it's a flag
+        if len(self.argv) <= parameter_index + 1:
+            return True
+
+        # Else, get the value specified
+        parameter_value = self.argv[parameter_index + 1]
+
+        # If this value is also a parameter then no value was specified, so assume it's a flag
+        if len(parameter_value) >= 2 and parameter_value[0] == "-" and not parameter_value[1].isdigit():
+            return True
+
+        # Else, interpret in the value, remembering it if it can be shared
+        parameter_value = safe_eval(parameter_value, frozen)
+        if type(parameter_value) in self.immutable_types:
+            self._immutable_values[parameter_index] = parameter_value
+        return parameter_value
+
+
+_cached_argv_index = _ArgvIndex([])
+
+
+def _argv_index():
+    """
+    Gets the index of the current command line arguments, rebuilding it if they have changed.
+
+    The index keeps its own copy of the arguments, so any change to sys.argv is seen, including changes in place. The
+    comparison runs at C speed and stops at the first argument which isn't the same object, so it is cheap next to
+    building the index.
+    """
+    global _cached_argv_index
+    argv_index = _cached_argv_index
+    if sys.argv != argv_index.argv:
+        argv_index = _cached_argv_index = _ArgvIndex(sys.argv)
+    return argv_index
+
+
+def _short_form(parameter):
+    """
+    Gets the short form of a parameter, made of the first letter of each word. Words are split on underscores and
+    dots, so both var_1 and var.1 become -v1.
+    """
+    return "-" + "".join([word[0] for word in parameter.replace(".", "_").split("_") if word])
+
+
+def _generate_argv(arguments, parameters):
+    """
+    Generates each argument followed by the canonical string of its value.
+    """
+    for argument, (_, value) in zip(arguments, parameters):
+        yield argument
+        yield safe_repr(value)
+
+
+def _flatten_config(config, prefix):
+    """
+    Generates dotted parameter names and values from nested mappings with string keys.
+    """
+    for parameter, value in config.items():
+        if isinstance(value, Mapping) and value and all(isinstance(key, str) and key for key in value):
+            yield from _flatten_config(value, prefix + parameter + ".")
+        else:
+            yield prefix + parameter, value
+
+
+def _merge_namespace(defaults, node, argv_index, return_type, frozen):
+    """
+    Merges the part of the prefix tree under the node over a nested dictionary of defaults, converting each level of
+    the namespace to the return type.
+    """
+    if node is not None and node.index is not None:
+        raise ValueError("{} is given as both a value and a namespace".format(argv_index.argv[node.index]))
+    children = node.children if node is not None else {}
+    namespace = {}
+
+    # Defaults come first, with any command line values in their place
+    for word, default in defaults.items():
+        child = children.get(word)
+        if child is not None and not child.children:
+            namespace[word] = argv_index.value(child.index, frozen)
+        elif child is not None or isinstance(default, Mapping):
+            namespace[word] = _merge_namespace(
+                default if isinstance(default, Mapping) else {}, child, argv_index, return_type, frozen)
+        else:
+            namespace[word] = _freeze_shared(default) if frozen else default
+
+    # Then anything else given via command line
+    for word, child in children.items():
+        if word in namespace:
+            continue
+        elif child.children:
+            namespace[word] = _merge_namespace({}, child, argv_index, return_type, frozen)
+        else:
+            namespace[word] = argv_index.value(child.index, frozen)
+
+    if return_type == dict:
+        return FrozenDict(namespace) if frozen else namespace
+    return return_type(**namespace)
+
+
+def _call_chunk(wrapper, configured_parameters, unparsed_parameters, chunk):
+    """
+    Calls a configurable function on each item of a chunk with parameters which have already been configured, along
+    with the text of any which need to be interpreted afresh for each item.
+
+    This takes the wrapper rather than the function so it can be pickled by reference for process pools.
+    """
+    call_configured = wrapper._call_configured
+    if not unparsed_parameters:
+        return [call_configured(configured_parameters, (item, ), {}) for item in chunk]
+    results = []
+    for item in chunk:
+        item_parameters = dict(configured_parameters)
+        for parameter, parameter_text in unparsed_parameters.items():
+            item_parameters[parameter] = safe_eval(parameter_text)
+        results.append(call_configured(item_parameters, (item, ), {}))
+    return results
+
+
+def _stream_chunks(call_chunk, iterable, workers, chunksize, ordered, executor, buffersize):
+    """
+    Streams chunks of the iterable through call_chunk in an executor, yielding each result.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1, not {}".format(chunksize))
+    if buffersize is not None and buffersize < 1:
+        raise ValueError("buffersize must be at least 1, not {}".format(buffersize))
+    executor_types = {"thread": futures.ThreadPoolExecutor, "process": futures.ProcessPoolExecutor}
+    if executor is not None and not isinstance(executor, futures.Executor) and executor not in executor_types:
+        raise ValueError("executor must be 'thread', 'process', None or an Executor, not {!r}".format(executor))
+    iterator = iter(iterable)
+    chunks = iter(lambda: list(itertools.islice(iterator, chunksize)), [])
+    return _stream(call_chunk, chunks, workers, ordered, executor, executor_types, buffersize)
+
+
+def _stream(call_chunk, chunks, workers, ordered, executor, executor_types, buffersize):
+
+    # Without an executor, just run each chunk in turn
+    if executor is None:
+        for chunk in chunks:
+            yield from call_chunk(chunk)
+        return
+
+    # Only shut down the pool if it's ours
+    pool = executor if isinstance(executor, futures.Executor) else executor_types[executor](workers)
+    if buffersize is None:
+        buffersize = 2 * (workers or os.cpu_count() or 1)
+    pending = collections.deque()
+    try:
+        for chunk in chunks:
+
+            # Wait for some results before submitting more chunks, so the buffer stays bounded
+            if len(pending) >= buffersize:
+                yield from _take_results(pending, ordered)
+            pending.append(pool.submit(call_chunk, chunk))
+        while pending:
+            yield from _take_results(pending, ordered)
+    finally:
+        for future in pending:
+            future.cancel()
+        if pool is not executor:
+            pool.shutdown()
+
+
+def _take_results(pending, ordered):
+    """
+    Removes the results of the oldest chunk from the pending futures, or any finished chunks if not ordered.
+    """
+    if ordered:
+        return pending.popleft().result()
+    done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+    results = []
+    for future in done:
+        pending.remove(future)
+        results.extend(future.result())
+    return results
@@ -1,7 +1,25 @@
 import unittest
-from .configurable import configurable
-from .safe_eval import safe_eval
+from .configurable import configurable, configurable_namespace, to_argv, fingerprint
+from .safe_eval import safe_eval, safe_repr
+from .frozen import freeze, FrozenDict
+from .config_server import ConfigServer, ConfigClient
 import sys
+import os
+import socket
+import asyncio
+import tempfile
+import threading
+import types
+import itertools
+import inspect
+import enum
+import collections
+from concurrent import futures
+
+
+@configurable
+def configurable_power(x, power=2):
+    return x ** power
 
 
 class ConfigurableVariableTests(unittest.TestCase):
@@ -232,6 +250,14 @@ class ConfigurableVariableTests(unittest.TestCase):
         test_output = configurable(return_type=dict, test_output=1, not_given=2)
         self.assertEqual(test_output, {"test_output": 1, "not_given": 2})
 
+    def test_return_type_with_options(self):
+
+        # Options with a return type but no parameters still return values rather than a decorator
+        sys.argv = ["python_script.py"]
+        self.assertEqual(configurable(return_type=dict, source={}), {})
+        self.assertEqual(configurable(return_type=tuple, frozen=True), ())
+        self.assertEqual(configurable(return_type=list, source={"x": 1}, frozen=True), [])
+
     def test_return_type_tuple(self):
 
         # No input, no output
@@ -286,6 +312,216 @@ class ConfigurableVariableTests(unittest.TestCase):
         test_output = configurable(return_type=list, test_output=1, not_given=2)
         self.assertEqual(test_output, [1, 2])
 
+    def test_frozen(self):
+
+        # Values from the command line
+        sys.argv = ["python_script.py", "--test_list", "[1, {2: [3]}]", "--test_set", "{1, 2}", "--test_flag"]
+        test_list, test_set, test_flag = configurable(test_list=None, test_set=None, test_flag=False, frozen=True)
+        self.assertEqual(test_list, (1, FrozenDict({2: (3, )})))
+        self.assertEqual(test_set, frozenset({1, 2}))
+        self.assertEqual(test_flag, True)
+        hash(test_list)
+
+        # Identical values are shared
+        self.assertIs(configurable(test_list=None, frozen=True), test_list)
+
+        # Defaults and sources
+        sys.argv = ["python_script.py"]
+        test_dict, test_list = configurable(test_dict={1: [2]}, test_list=[], source={"test_list": [1]}, frozen=True)
+        self.assertEqual(test_dict, FrozenDict({1: (2, )}))
+        self.assertEqual(test_list, (1, ))
+
+        # Decorated functions
+        @configurable(frozen=True)
+        def test_func(x, y=None):
+            return x, y
+
+        sys.argv = ["python_script.py", "--x", "[1, 2]"]
+        self.assertEqual(test_func(1, [3]), ((1, 2), [3]))
+
+        # Values from defaults and sources are only frozen once, so the same objects are returned every time
+        test_source = {"x": [1, {2: [3]}], "y": (1, (2, ))}
+
+        @configurable(frozen=True, source=test_source)
+        def test_func(x=None, y=None):
+            return x, y
+
+        sys.argv = ["python_script.py"]
+        self.assertIs(test_func()[0], test_func()[0])
+        self.assertIs(test_func()[1], test_source["y"])
+        test_default = {"a": [1]}
+        self.assertIs(configurable(x=test_default, frozen=True), configurable(x=test_default, frozen=True))
+        self.assertIs(
+            configurable_namespace("db", hosts=test_default["a"], frozen=True)["hosts"],
+            configurable_namespace("db", hosts=test_default["a"], frozen=True)["hosts"])
+
+    def test_dotted(self):
+
+        # Long form
+        sys.argv = ["python_script.py", "--db.pool.size", "8"]
+        test_size = configurable(**{"db.pool.size": 4})
+        self.assertEqual(test_size, 8)
+
+        # Short form
+        sys.argv = ["python_script.py", "-dps", "8"]
+        test_size = configurable(**{"db.pool.size": 4})
+        self.assertEqual(test_size, 8)
+
+
+class ConfigurableNamespaceTests(unittest.TestCase):
+
+    def test_no_inputs(self):
+
+        # Only defaults are returned
+        sys.argv = ["python_script.py"]
+        self.assertEqual(configurable_namespace("db"), {})
+        self.assertEqual(
+            configurable_namespace("db", name="test", pool={"size": 4}),
+            {"name": "test", "pool": {"size": 4}})
+
+    def test_with_inputs(self):
+        sys.argv = [
+            "python_script.py",
+            "--db.pool.size", "8",
+            "--db.pool.timeout", "30",
+            "--db.name", "test",
+            "--db.options", "{'ssl': True}",
+            "--db.debug",
+            "--other.value", "1",
+        ]
+
+        # Subtrees
+        self.assertEqual(configurable_namespace("db.pool"), {"size": 8, "timeout": 30})
+        self.assertEqual(
+            configurable_namespace("db.pool", timeout=10, retries=3),
+            {"size": 8, "timeout": 30, "retries": 3})
+        self.assertEqual(configurable_namespace("db.missing", size=1), {"size": 1})
+
+        # Nested subtrees, merged over nested defaults
+        self.assertEqual(
+            configurable_namespace("db", name="prod", pool={"size": 4, "retries": 3}),
+            {
+                "name": "test",
+                "pool": {"size": 8, "timeout": 30, "retries": 3},
+                "options": {"ssl": True},
+                "debug": True})
+
+        # Everything
+        self.assertEqual(set(configurable_namespace()), {"db", "other"})
+
+    def test_frozen(self):
+        sys.argv = ["python_script.py", "--db.pool.size", "8", "--db.options", "[1, 2]"]
+        test_namespace = configurable_namespace("db", frozen=True, hosts=["a", "b"])
+        self.assertEqual(test_namespace, {"pool": {"size": 8}, "options": (1, 2), "hosts": ("a", "b")})
+        self.assertIsInstance(test_namespace, FrozenDict)
+        self.assertIsInstance(test_namespace["pool"], FrozenDict)
+        hash(test_namespace)
+
+    def test_mapping_defaults(self):
+        sys.argv = ["python_script.py", "--db.pool.size", "8"]
+        self.assertEqual(
+            configurable_namespace("db", pool=FrozenDict({"timeout": 3})),
+            {"pool": {"size": 8, "timeout": 3}})
+
+    def test_conflict(self):
+
+        # A parameter can't be both a value and a namespace
+        sys.argv = ["python_script.py", "--db", "5", "--db.pool.size", "8"]
+        with self.assertRaises(ValueError):
+            configurable_namespace()
+        with self.assertRaises(ValueError):
+            configurable_namespace("db")
+        self.assertEqual(configurable_namespace("db.pool"), {"size": 8})
+
+    def test_changing_inputs(self):
+
+        # Replacing, resizing or changing sys.argv in place are all seen
+        sys.argv = ["python_script.py", "--db.size", "8"]
+        self.assertEqual(configurable_namespace("db"), {"size": 8})
+        sys.argv.extend(["--db.name", "test"])
+        self.assertEqual(configurable_namespace("db"), {"size": 8, "name": "test"})
+        sys.argv[2] = "9"
+        self.assertEqual(configurable_namespace("db"), {"size": 9, "name": "test"})
+
+        # Including by configurable
+        sys.argv = ["python_script.py", "--x", "1"]
+        self.assertEqual(configurable(x=0), 1)
+        sys.argv[1:] = ["--x", "2"]
+        self.assertEqual(configurable(x=0), 2)
+        sys.argv[2] = "3"
+        self.assertEqual(configurable(x=0), 3)
+
+    def test_return_type(self):
+        sys.argv = ["python_script.py", "--db.pool.size", "8", "--db.options", "{'ssl': True}"]
+        test_namespace = configurable_namespace("db", return_type=types.SimpleNamespace)
+        self.assertEqual(test_namespace.pool.size, 8)
+        self.assertEqual(test_namespace.options, {"ssl": True})
+
+
+class ToArgvTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        test_config = {
+            "test_int": -12,
+            "test_float": 123.456,
+            "test_str": "-test",
+            "test_none": None,
+            "test_bool": True,
+            "test_tuple": (1, ),
+            "test_list": [1, "two", None],
+            "test_set": {3, 2, 1},
+            "test_dict": {1: "one", "two": [2]},
+        }
+
+        # Long form
+        sys.argv = ["python_script.py", *to_argv(test_config)]
+        self.assertEqual(configurable(return_type=dict, **{parameter: None for parameter in test_config}), test_config)
+
+        # Short form
+        test_config = {"max_iterations": 10, "test_list": [1, "two", None], "verbose": True}
+        sys.argv = ["python_script.py", *to_argv(test_config, short=True)]
+        self.assertEqual(sys.argv[1:], ["-mi", "10", "-tl", "[1, 'two', None]", "-v", "True"])
+        self.assertEqual(configurable(return_type=dict, **{parameter: None for parameter in test_config}), test_config)
+
+    def test_flatten(self):
+        test_config = {"db": {"pool": {"size": 8}, "name": "test"}, "ids": {1: 2}, "empty": {}}
+        self.assertEqual(
+            list(to_argv(test_config, flatten=True)),
+            ["--db.name", "'test'", "--db.pool.size", "8", "--empty", "{}", "--ids", "{1: 2}"])
+
+        # Round trip through namespaces
+        sys.argv = ["python_script.py", *to_argv(test_config, flatten=True)]
+        self.assertEqual(configurable_namespace("db"), test_config["db"])
+
+    def test_collisions(self):
+        with self.assertRaises(ValueError):
+            to_argv({"max_iterations": 1, "min_items": 2}, short=True)
+        with self.assertRaises(ValueError):
+            to_argv({"a.b": 1, "a": {"b": 2}}, flatten=True)
+        with self.assertRaises(ValueError):
+            fingerprint({"a.b": 1, "a": {"b": 2}}, flatten=True)
+        self.assertEqual(len(list(to_argv({"max_iterations": 1, "min_items": 2}))), 4)
+
+    def test_canonical(self):
+
+        # Equal configurations give the same arguments regardless of order or mutability
+        test_config = {"b": {"y": 2, "x": {3, 1, 2}}, "a": (1, 2)}
+        test_frozen = freeze({"a": (1, 2), "b": {"x": {1, 2, 3}, "y": 2}})
+        self.assertEqual(list(to_argv(test_config)), ["--a", "(1, 2)", "--b", "{'x': {1, 2, 3}, 'y': 2}"])
+        self.assertEqual(list(to_argv(test_config)), list(to_argv(test_frozen)))
+        self.assertEqual(fingerprint(test_config), fingerprint(test_frozen))
+
+        # Values which are equal but of different types or signs are not normalized
+        self.assertNotEqual(fingerprint({"lr": 1}), fingerprint({"lr": 1.0}))
+        self.assertNotEqual(fingerprint({"lr": 1}), fingerprint({"lr": True}))
+        self.assertNotEqual(fingerprint({"lr": 0.0}), fingerprint({"lr": -0.0}))
+        self.assertNotEqual(fingerprint({"lr": [1, 2]}), fingerprint(freeze({"lr": [1, 2]})))
+
+        # Different configurations give different fingerprints
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": "1"}))
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 1, "b": None}))
+        self.assertEqual(len(fingerprint({})), 64)
+
 
 class ConfigurableFunctionTests(unittest.TestCase):
 
@@ -437,6 +673,334 @@ class ConfigurableFunctionTests(unittest.TestCase):
             test_func(1, 2, -3, -4, 5, 6, e=7, f=8, g=-9, h=-10, i=11, j=12),
             (1, 102, -3, 104, (5, 6), 7, 108, -9, 110, {'i': 11, 'j': 112}))
 
+    def test_source(self):
+
+        # Define function
+        @configurable(source={"x": 7, "y": 8})
+        def test_func(x, y=10):
+            return x, y
+
+        # Make sure the source is used, but command line arguments take precedence
+        sys.argv = ["python_script.py"]
+        self.assertEqual(test_func(1), (7, 8))
+        sys.argv = ["python_script.py", "--y", "12"]
+        self.assertEqual(test_func(1), (7, 12))
+
+
+class ConfigurableAsyncTests(unittest.TestCase):
+
+    def test_coroutine_function(self):
+
+        # Define function
+        @configurable
+        async def test_func(x, y=10):
+            return x, y
+
+        # Make sure it's still a coroutine function with the same signature
+        self.assertTrue(inspect.iscoroutinefunction(test_func))
+        self.assertEqual(str(inspect.signature(test_func)), "(x, y=10)")
+
+        # Make sure the variable changed
+        sys.argv = ["python_script.py"]
+        self.assertEqual(asyncio.run(test_func(1)), (1, 10))
+        sys.argv = ["python_script.py", "--y", "12"]
+        self.assertEqual(asyncio.run(test_func(1)), (1, 12))
+        self.assertEqual(asyncio.run(test_func(x=1, y=2)), (1, 12))
+
+    def test_async_generator_function(self):
+
+        # Define function
+        @configurable
+        async def test_func(x, y=10):
+            for value in (x, y):
+                yield value
+
+        # Make sure it's still an async generator function
+        self.assertTrue(inspect.isasyncgenfunction(test_func))
+
+        async def collect(async_generator):
+            return [value async for value in async_generator]
+
+        # Make sure the variable changed
+        sys.argv = ["python_script.py"]
+        self.assertEqual(asyncio.run(collect(test_func(1))), [1, 10])
+        sys.argv = ["python_script.py", "-y", "12"]
+        self.assertEqual(asyncio.run(collect(test_func(1))), [1, 12])
+
+    def test_async_generator_protocol(self):
+        events = []
+
+        # Define function
+        @configurable
+        async def test_func(x=0):
+            try:
+                while True:
+                    try:
+                        x += yield x
+                    except KeyError:
+                        events.append("thrown")
+                        x = -1
+            finally:
+                events.append("closed")
+
+        async def drive(async_generator):
+            results = [await async_generator.asend(None), await async_generator.asend(2)]
+            results.append(await async_generator.athrow(KeyError))
+            results.append(await async_generator.asend(5))
+            await async_generator.aclose()
+            return results
+
+        # Make sure sent values, thrown exceptions and closing all reach the original generator
+        sys.argv = ["python_script.py", "--x", "10"]
+        self.assertEqual(asyncio.run(drive(test_func())), [10, 12, -1, 4])
+        self.assertEqual(events, ["thrown", "closed"])
+
+        # Make sure exceptions it doesn't handle still propagate
+        async def throw(async_generator):
+            await async_generator.asend(None)
+            await async_generator.athrow(ValueError)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(throw(test_func()))
+
+    def test_changing_inputs(self):
+
+        # Define function
+        @configurable(source={"y": 8})
+        async def test_func(x, y=10, **kwargs):
+            return x, y, kwargs
+
+        # Make sure changes to the command line arguments are seen between calls
+        sys.argv = ["python_script.py", "--x", "7"]
+        self.assertEqual(asyncio.run(test_func(1)), (7, 8, {}))
+        sys.argv = ["python_script.py", "--y", "12", "--z", "3"]
+        self.assertEqual(asyncio.run(test_func(1)), (1, 12, {}))
+        self.assertEqual(asyncio.run(test_func(1, z=1)), (1, 12, {"z": 3}))
+
+    def test_mutable_inputs(self):
+
+        # Define function
+        @configurable
+        async def test_func(x):
+            x.append(1)
+            return x
+
+        # Make sure each call gets a fresh value
+        sys.argv = ["python_script.py", "--x", "[]"]
+        self.assertEqual(asyncio.run(test_func()), [1])
+        self.assertEqual(asyncio.run(test_func()), [1])
+
+
+class ConfigurableMapTests(unittest.TestCase):
+
+    def test_no_inputs(self):
+
+        # Make sure nothing changed
+        sys.argv = ["python_script.py"]
+        self.assertEqual(list(configurable_power.map(range(10))), [x ** 2 for x in range(10)])
+        self.assertEqual(list(configurable_power.map([])), [])
+
+    def test_with_inputs(self):
+
+        # Configuration is resolved when map is called
+        sys.argv = ["python_script.py", "--power", "3"]
+        test_results = configurable_power.map(range(10))
+        sys.argv = ["python_script.py"]
+        self.assertEqual(list(test_results), [x ** 3 for x in range(10)])
+
+        # Configured positional arguments override the items
+        sys.argv = ["python_script.py", "--x", "2"]
+        self.assertEqual(list(configurable_power.map(range(3))), [4, 4, 4])
+
+    def test_mutable_inputs(self):
+
+        # Define function
+        @configurable
+        def test_func(item, acc=None):
+            acc.append(item)
+            return len(acc)
+
+        # Make sure each item gets a fresh value, like each call does
+        sys.argv = ["python_script.py", "--acc", "[]"]
+        self.assertEqual([test_func(1), test_func(2)], [1, 1])
+        for executor in (None, "thread"):
+            self.assertEqual(list(test_func.map(range(5), executor=executor)), [1] * 5)
+
+        # Frozen values are shared
+        @configurable(frozen=True)
+        def test_func(item, acc=None):
+            return acc
+
+        test_results = list(test_func.map(range(3), executor=None))
+        self.assertEqual(test_results, [(), (), ()])
+        self.assertIs(test_results[0], test_results[1])
+
+    def test_missing_inputs(self):
+
+        # Define function
+        @configurable
+        def test_func(item, required):
+            return item, required
+
+        # Unconfigured parameters are handled the same way as in normal calls
+        sys.argv = ["python_script.py"]
+        self.assertEqual(list(test_func.map(range(2), executor=None)), [test_func(0), test_func(1)])
+
+    def test_executors(self):
+        sys.argv = ["python_script.py", "--power", "3"]
+        expected = [x ** 3 for x in range(100)]
+
+        # Ordered
+        for executor in (None, "thread", "process"):
+            self.assertEqual(list(configurable_power.map(range(100), workers=2, executor=executor)), expected)
+            self.assertEqual(
+                list(configurable_power.map(range(100), workers=2, chunksize=7, buffersize=1, executor=executor)),
+                expected)
+
+        # Unordered
+        test_results = configurable_power.map(range(100), workers=4, chunksize=3, ordered=False)
+        self.assertEqual(sorted(test_results), expected)
+
+        # Existing executors are left running
+        with futures.ThreadPoolExecutor(2) as executor:
+            self.assertEqual(list(configurable_power.map(range(100), executor=executor)), expected)
+            self.assertEqual(executor.submit(int, 1).result(), 1)
+
+    def test_bounded(self):
+
+        # Only a bounded number of items should be read ahead of the results
+        sys.argv = ["python_script.py"]
+        test_items = itertools.count()
+        test_results = configurable_power.map(test_items, workers=2, chunksize=5, buffersize=2)
+        self.assertEqual(next(test_results), 0)
+        self.assertLessEqual(next(test_items), 15)
+        test_results.close()
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            configurable_power.map(range(10), chunksize=0)
+        with self.assertRaises(ValueError):
+            configurable_power.map(range(10), executor="heck")
+        for buffersize in (0, -1):
+            with self.assertRaises(ValueError):
+                configurable_power.map(range(10), buffersize=buffersize)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets are not supported")
+class ConfigServerTests(unittest.TestCase):
+
+    def setUp(self):
+
+        # Run the server on an event loop in a background thread, like it would be in its own process
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "config.sock")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.server = ConfigServer(self.path, {"test_int": 1, "test_list": [1, "two", None]})
+        self.run_on_server(self.server.start())
+
+    def tearDown(self):
+        self.run_on_server(self.server.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.directory.cleanup()
+
+    def run_on_server(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(10)
+
+    def update_server(self, **kwargs):
+        async def _update():
+            return self.server.update(**kwargs)
+        return self.run_on_server(_update())
+
+    def test_snapshot(self):
+        with ConfigClient(self.path) as client:
+            self.assertEqual(client.version, 0)
+            self.assertEqual(client.values, {"test_int": 1, "test_list": [1, "two", None]})
+
+    def test_update(self):
+        with ConfigClient(self.path) as client:
+
+            # Update and add values
+            version = self.update_server(test_int=2, test_str="test")
+            self.assertTrue(client.wait_for_version(version, 10))
+            self.assertEqual(client.values, {"test_int": 2, "test_list": [1, "two", None], "test_str": "test"})
+
+            # Remove values
+            version = self.update_server(remove=["test_list"])
+            self.assertTrue(client.wait_for_version(version, 10))
+            self.assertEqual(client.values, {"test_int": 2, "test_str": "test"})
+
+        # Clients connecting later get the latest snapshot
+        with ConfigClient(self.path) as client:
+            self.assertEqual(client.version, 2)
+            self.assertEqual(client.values, {"test_int": 2, "test_str": "test"})
+
+    def test_unreadable_values(self):
+        with ConfigClient(self.path) as client:
+
+            # Values which can't be read back are rejected without changing anything
+            for test_value in (float("inf"), float("nan"), FrozenDict({1: 2}), object()):
+                with self.assertRaises(ValueError):
+                    self.update_server(test_int=2, test_value=test_value)
+            self.assertEqual(self.server.version, 0)
+            self.assertEqual(self.server.values, {"test_int": 1, "test_list": [1, "two", None]})
+            with self.assertRaises(ValueError):
+                ConfigServer(self.path, {"test_value": float("inf")})
+
+            # Clients which fail to read an update raise rather than using a stale snapshot
+            async def _broadcast_unreadable():
+                self.server._broadcast(1, {"test_value": FrozenDict()}, ())
+            self.run_on_server(_broadcast_unreadable())
+            with self.assertRaises(RuntimeError):
+                client.wait_for_version(1, 10)
+            with self.assertRaises(RuntimeError):
+                client.get("test_int")
+
+    def test_server_closed(self):
+        with ConfigClient(self.path) as client:
+            self.assertEqual(client.get("test_int"), 1)
+
+            # Clients raise rather than using a stale snapshot once the server has gone
+            self.run_on_server(self.server.close())
+            with self.assertRaises(RuntimeError):
+                client.wait_for_version(1, 10)
+            with self.assertRaises(RuntimeError):
+                client.get("test_int")
+            with self.assertRaises(RuntimeError):
+                configurable(test_int=None, source=client)
+
+    def test_shared_values(self):
+        with ConfigClient(self.path) as client:
+
+            # Values from the source are shared rather than copied
+            sys.argv = ["python_script.py"]
+            self.assertIs(configurable(test_list=None, source=client), client.values["test_list"])
+
+            # Unless they're frozen
+            test_list = configurable(test_list=None, source=client, frozen=True)
+            self.assertEqual(test_list, (1, "two", None))
+
+    def test_failed_start(self):
+        thread_count = threading.active_count()
+        with self.assertRaises(OSError):
+            ConfigClient(os.path.join(self.directory.name, "missing.sock")).start()
+        self.assertEqual(threading.active_count(), thread_count)
+
+    def test_configurable(self):
+        with ConfigClient(self.path) as client:
+
+            # Make sure the source is used, but command line arguments take precedence
+            sys.argv = ["python_script.py", "--test_list", "[]"]
+            test_int, test_list, not_given = configurable(test_int=None, test_list=None, not_given=3, source=client)
+            self.assertEqual((test_int, test_list, not_given), (1, [], 3))
+
+            # Make sure updates are seen without reconnecting
+            self.assertTrue(client.wait_for_version(self.update_server(test_int=2), 10))
+            self.assertEqual(configurable(test_int=None, source=client), 2)
+
 
 class SafeEvalTests(unittest.TestCase):
 
@@ -532,6 +1096,115 @@ class SafeEvalTests(unittest.TestCase):
         test_value = safe_eval("dict()")
         self.assertEqual(test_value, {})
 
+    def test_frozen(self):
+
+        # Test each mutable type
+        self.assertEqual(safe_eval("[1, [2]]", frozen=True), (1, (2, )))
+        self.assertEqual(safe_eval("{1, (2, 3)}", frozen=True), frozenset({1, (2, 3)}))
+        self.assertEqual(safe_eval("{1: {2: [3]}}", frozen=True), FrozenDict({1: FrozenDict({2: (3, )})}))
+
+        # Test functions
+        self.assertEqual(safe_eval("list()", frozen=True), ())
+        self.assertEqual(safe_eval("set()", frozen=True), frozenset())
+        self.assertEqual(safe_eval("dict()", frozen=True), FrozenDict())
+
+        # Test immutable types are unchanged
+        self.assertEqual(safe_eval("1", frozen=True), 1)
+        self.assertEqual(safe_eval("Heck", frozen=True), "Heck")
+
+        # Test identical values are interned
+        self.assertIs(safe_eval("[1, {2: 3}]", frozen=True), safe_eval("[1, {2: 3}]", frozen=True))
+
+
+class SafeReprTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        for test_value in (
+                1, -1, 1.5, -0.0, float("inf"), float("-inf"), 1 + 2j, True, False, None, "", "Heck", "'\n", b"bytes",
+                (), (1, ), (1, 2), [], [1, [2, "three"]], set(), {1, "two"}, {}, {1: {2: [3]}, "four": (5, )}):
+            self.assertEqual(safe_eval(safe_repr(test_value)), test_value)
+            self.assertEqual(type(safe_eval(safe_repr(test_value))), type(test_value))
+
+    def test_canonical(self):
+
+        # Sets and dicts are sorted
+        self.assertEqual(safe_repr({3, 1, 2}), "{1, 2, 3}")
+        self.assertEqual(safe_repr({"b": 1, "a": 2}), "{'a': 2, 'b': 1}")
+        self.assertEqual(safe_repr({"b": 1, "a": 2}), safe_repr({"a": 2, "b": 1}))
+
+        # Frozen values are represented like their mutable equivalents
+        self.assertEqual(safe_repr(frozenset({1, 2})), safe_repr({1, 2}))
+        self.assertEqual(safe_repr(FrozenDict({1: (2, )})), "{1: (2,)}")
+
+    def test_subclasses(self):
+
+        # Custom reprs are ignored
+        class Color(str, enum.Enum):
+            RED = "red"
+
+        class Size(int, enum.Enum):
+            SMALL = 1
+
+        self.assertEqual(safe_repr(Color.RED), "'red'")
+        self.assertEqual(safe_repr([Color.RED, Size.SMALL]), "['red', 1]")
+        self.assertEqual(safe_repr(collections.OrderedDict([("b", 1), ("a", 2)])), "{'a': 2, 'b': 1}")
+
+    def test_complex(self):
+        for test_value in (complex("inf"), complex(0, float("-inf")), complex(float("-inf"), 3), complex(1, -2)):
+            self.assertEqual(safe_eval(safe_repr(test_value)), test_value)
+            self.assertEqual(type(safe_eval(safe_repr(test_value))), complex)
+        with self.assertRaises(ValueError):
+            safe_repr(complex(1, float("nan")))
+
+    def test_unhashable(self):
+
+        # Sets and mappings would be read back as unhashable objects inside sets and dictionary keys
+        for test_value in (
+                {frozenset({1, 2})}, {FrozenDict({1: 2}): 3}, {(1, frozenset()): 2}, freeze({frozenset({1}): 2})):
+            with self.assertRaises(TypeError):
+                safe_repr(test_value)
+
+        # But they're fine anywhere else
+        self.assertEqual(safe_repr({1: frozenset({2})}), "{1: {2}}")
+        self.assertEqual(safe_repr({(1, (2, )): 3}), "{(1, (2,)): 3}")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            safe_repr(float("nan"))
+        with self.assertRaises(TypeError):
+            safe_repr(object())
+
+
+class FrozenTests(unittest.TestCase):
+
+    def test_freeze(self):
+        test_value = freeze({"a": [1, {2, 3}], "b": {"c": [4]}})
+        self.assertEqual(test_value, FrozenDict({"a": (1, frozenset({2, 3})), "b": FrozenDict({"c": (4, )})}))
+        self.assertIsInstance(test_value["b"], FrozenDict)
+
+        # Frozen values aren't copied
+        self.assertIs(freeze(test_value), test_value)
+        test_tuple = (1, (2, frozenset({3})))
+        self.assertIs(freeze(test_tuple), test_tuple)
+        self.assertIsNot(freeze((1, [2])), freeze((1, [2])))
+
+    def test_frozen_dict(self):
+        test_dict = FrozenDict({1: 2}, three=4)
+
+        # Behaves like a dict
+        self.assertEqual(test_dict, {1: 2, "three": 4})
+        self.assertEqual(test_dict[1], 2)
+        self.assertEqual(len(test_dict), 2)
+        self.assertEqual(list(test_dict.items()), [(1, 2), ("three", 4)])
+
+        # But can't be changed
+        with self.assertRaises(TypeError):
+            test_dict[1] = 3
+
+        # And can be hashed
+        self.assertEqual(hash(test_dict), hash(FrozenDict({"three": 4, 1: 2})))
+        self.assertEqual(len({test_dict, FrozenDict({"three": 4, 1: 2})}), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,109 @@
+from collections.abc import Mapping
+
+
+# Frozen equivalents of recently frozen objects, keyed by their id. The objects themselves are kept alongside, so their
+# ids can't be reused while they're cached
+_frozen_by_id = {}
+_frozen_by_id_size = 1024
+
+
+class FrozenDict(Mapping):
+    """
+    An immutable, hashable dictionary.
+
+    This behaves like a read-only view of a dictionary, but unlike types.MappingProxyType it owns its values and can be
+    hashed, so it can be used as a dictionary key, a set member or part of a cache key.
+
+    :param args:
+    The same arguments as dict.
+
+    :param kwargs:
+    The same arguments as dict.
+    """
+
+    __slots__ = ("_values", "_hash")
+
+    def __init__(self, *args, **kwargs):
+        self._values = dict(*args, **kwargs)
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self._values.items()))
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenDict):
+            return self._values == other._values
+        return self._values == other
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self._values)
+
+    def __reduce__(self):
+        return type(self), (self._values, )
+
+
+def freeze(value):
+    """
+    Creates a deeply immutable equivalent of a python object.
+
+    Lists and tuples become tuples, sets become frozensets and dictionaries become FrozenDicts, with all of their
+    contents frozen too. Anything else is returned as it is, as are objects which are already frozen.
+
+    For example, [1, {2: [3]}] becomes (1, FrozenDict({2: (3, )})).
+
+    :param value:
+    The object to freeze.
+
+    :return:
+    The frozen object.
+    """
+    if isinstance(value, (list, tuple)):
+        items = tuple([freeze(item) for item in value])
+        if type(value) is tuple and all(item is original for item, original in zip(items, value)):
+            return value
+        return items
+    elif isinstance(value, (set, frozenset)):
+        items = [freeze(item) for item in value]
+        if type(value) is frozenset and all(item is original for item, original in zip(items, value)):
+            return value
+        return frozenset(items)
+    elif isinstance(value, (dict, FrozenDict)):
+        items = [(freeze(key), freeze(item)) for key, item in value.items()]
+        if type(value) is FrozenDict and all(
+                key is original_key and item is original_item
+                for (key, item), (original_key, original_item) in zip(items, value.items())):
+            return value
+        return FrozenDict(items)
+    else:
+        return value
+
+
+def _freeze_shared(value):
+    """
+    Freezes an object which is likely to be frozen again, such as a value from a source or a default, returning the
+    same frozen object each time rather than copying it again.
+    """
+    if not isinstance(value, (list, tuple, set, frozenset, dict, FrozenDict)):
+        return value
+    cached = _frozen_by_id.get(id(value))
+    if cached is not None and cached[0] is value:
+        return cached[1]
+    frozen_value = freeze(value)
+    if len(_frozen_by_id) >= _frozen_by_id_size:
+        _frozen_by_id.clear()
+    _frozen_by_id[id(value)] = (value, frozen_value)
+    return frozen_value
@@ -1,7 +1,11 @@
 from ast import literal_eval
+from .frozen import freeze
+from collections.abc import Mapping
+import functools
+import math
 
 
-def safe_eval(code_string):
+def safe_eval(code_string, frozen=False):
     """
     Safely creates a python object from a string representing it.
 
@@ -11,9 +15,16 @@ def safe_eval(code_string):
 
     :param code_string:
     The string
+    :param frozen:
+    Default: False
+    If True, return a deeply immutable equivalent of the object, as created by freeze. These are interned, so evaluating
+    the same string again returns the same object without any copying.
     :return:
     """
 
+    if frozen:
+        return _frozen_eval(code_string)
+
     # Allow people to use the functions to create empty objects
     type_function_from_code_str = {
         "int()": int(),
@@ -35,3 +46,120 @@ def safe_eval(code_string):
     # If not then they were probably trying to pass in a string
     except (ValueError, SyntaxError):
         return code_string
+
+
+@functools.lru_cache(maxsize=4096)
+def _frozen_eval(code_string):
+    """
+    Evaluates and freezes a string, interning the result so identical strings share the same object.
+    """
+    return freeze(safe_eval(code_string))
+
+
+def safe_repr(value):
+    """
+    Creates a canonical string representing a python object, which safe_eval will turn back into an equal object.
+
+    This is the inverse of safe_eval. Equal objects of the same types always give the same string, so sets are sorted
+    and dictionaries are sorted by key. Frozensets and FrozenDicts are represented the same way as sets and
+    dictionaries, but tuples and lists are not, so freeze([1, 2]) gives "(1, 2)" while [1, 2] gives "[1, 2]".
+
+    Objects which compare equal but have different types or signs are not normalized, so 1, 1.0 and True all give
+    different strings, as do 0.0 and -0.0.
+
+    For example, both {3: 4, 1: 2} and FrozenDict({1: 2, 3: 4}) give the string "{1: 2, 3: 4}".
+
+    :param value:
+    The object, which can be made up of None, bools, numbers, strings, bytes, tuples, lists, sets and mappings.
+    :return:
+    The string.
+    :raises TypeError:
+    If the object has any other type, or has a set or mapping inside a set or dictionary key, as safe_eval would read
+    these back as unhashable sets and dictionaries.
+    :raises ValueError:
+    If the object contains nan, which can't be read back.
+    """
+    represent = _represent_by_type.get(type(value))
+    if represent is not None:
+        return represent(value)
+
+    # Fall back on the base type for subclasses, ignoring any custom repr
+    for base_type, represent in _represent_by_type.items():
+        if isinstance(value, base_type):
+            return represent(value)
+    if isinstance(value, Mapping):
+        return _represent_dict(value)
+    raise TypeError("Cannot represent objects of type {} safely".format(type(value).__name__))
+
+
+# Types whose repr is already canonical and can be read by safe_eval
+_scalar_types = frozenset((type(None), bool, int, str, bytes))
+
+
+def _represent_float(value):
+    if math.isinf(value):
+        return "1e309" if value > 0 else "-1e309"
+    elif math.isnan(value):
+        raise ValueError("Cannot represent nan safely")
+    return float.__repr__(value)
+
+
+def _represent_complex(value):
+    if math.isfinite(value.real) and math.isfinite(value.imag):
+        return complex.__repr__(value)
+    imag = _represent_float(value.imag)
+    return "(" + _represent_float(value.real) + ("" if imag.startswith("-") else "+") + imag + "j)"
+
+
+def _represent_items(values):
+    """
+    Joins the canonical strings of each value, using repr directly when every value is a simple scalar.
+    """
+    if all(type(item) in _scalar_types for item in values):
+        return repr(list(values))[1:-1]
+    return ", ".join([safe_repr(item) for item in values])
+
+
+def _represent_key(value):
+    """
+    Represents a set item or dictionary key, which safe_eval must be able to hash.
+    """
+    if isinstance(value, (set, frozenset, Mapping)):
+        raise TypeError("Cannot represent {!r} safely inside a set or dictionary key".format(value))
+    elif isinstance(value, tuple):
+        for item in value:
+            _represent_key(item)
+    return safe_repr(value)
+
+
+def _represent_tuple(value):
+    if len(value) == 1:
+        return "(" + safe_repr(value[0]) + ",)"
+    return "(" + _represent_items(value) + ")"
+
+
+def _represent_list(value):
+    return "[" + _represent_items(value) + "]"
+
+
+def _represent_set(value):
+    if not value:
+        return "set()"
+    return "{" + ", ".join(sorted([_represent_key(item) for item in value])) + "}"
+
+
+def _represent_dict(value):
+    return "{" + ", ".join(sorted([
+        _represent_key(key) + ": " + safe_repr(item) for key, item in value.items()])) + "}"
+
+
+_represent_by_type = {
+    **{scalar_type: scalar_type.__repr__ for scalar_type in _scalar_types},
+    float: _represent_float,
+    complex: _represent_complex,
+    tuple: _represent_tuple,
+    list: _represent_list,
+    set: _represent_set,
+    frozenset: _represent_set,
+    dict: _represent_dict,
+}